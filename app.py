@@ -7,13 +7,20 @@ with dynamic themes, interactive filters, and advanced visualizations.
 import streamlit as st
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
 import plotly.express as px
 import plotly.graph_objects as go
-import plotly.figure_factory as ff
 import os
+import io
+import calendar
+import hashlib
 import warnings
 
+# PyArrow is optional; CSV parsing falls back to the pandas C engine without it
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pacsv
+except ImportError:
+    pa = None
 
 # Suppress warnings for cleaner output
 warnings.filterwarnings("ignore")
@@ -31,7 +38,7 @@ st.set_page_config(
 # ============================================================================
 # CUSTOM CSS STYLING
 # ============================================================================
-st.markdown("""
+CUSTOM_CSS = """
     <style>
     /* Main background and text styling */
     .main {
@@ -83,13 +90,21 @@ st.markdown("""
         border-radius: 5px;
     }
     </style>
-""", unsafe_allow_html=True)
+"""
+
+# Streamlit clears elements that are not re-emitted on a rerun, so the static
+# HTML blocks are rendered every run from these module-level constants
+st.markdown(CUSTOM_CSS, unsafe_allow_html=True)
 
 # ============================================================================
 # HEADER SECTION
 # ============================================================================
-st.markdown('<h1 class="dashboard-title">📊 Superstore Sales Analytics</h1>', unsafe_allow_html=True)
-st.markdown('<p class="dashboard-subtitle">Unlock insights from your sales data with interactive visualizations and real-time analytics</p>', unsafe_allow_html=True)
+HEADER_HTML = (
+    '<h1 class="dashboard-title">📊 Superstore Sales Analytics</h1>'
+    '<p class="dashboard-subtitle">Unlock insights from your sales data with interactive visualizations and real-time analytics</p>'
+)
+
+st.markdown(HEADER_HTML, unsafe_allow_html=True)
 
 # ============================================================================
 # SIDEBAR - THEME SELECTION
@@ -100,6 +115,299 @@ theme = st.sidebar.selectbox(
     ["plotly", "plotly_white", "plotly_dark", "ggplot2", "seaborn", "simple_white"]
 )
 
+# ============================================================================
+# DATA LOADING
+# ============================================================================
+# Cache limits so a long-running, multi-user server does not keep every
+# upload and filter combination in memory indefinitely
+DATA_CACHE_ENTRIES = 8
+AGG_CACHE_ENTRIES = 256
+CACHE_TTL_SECONDS = 3600
+
+# Columns used by the dashboard; anything else in the upload is not parsed
+USED_COLUMNS = {
+    "Order Date", "Region", "State", "City", "Category", "Sub-Category",
+    "Segment", "Sales", "Profit", "Quantity", "Order ID", "Customer ID",
+    "Product Name"
+}
+
+# Low-cardinality text columns stored as pandas categoricals
+CATEGORY_COLUMNS = [
+    "Region", "State", "City", "Category", "Sub-Category", "Segment",
+    "Customer ID", "Order ID", "Product Name"
+]
+
+# Date formats tried, in order, when PyArrow infers the Order Date column.
+# %m/%d/%y must come before %m/%d/%Y: Arrow's %Y also accepts two-digit
+# years (8/11/16 -> 0016-08-11), while %y rejects four-digit ones.
+DATE_FORMATS = ["%Y-%m-%d", "%m/%d/%y", "%m/%d/%Y"]
+
+# Earliest Order Date year accepted from the PyArrow parser
+MIN_ORDER_YEAR = 1900
+
+# Cell values PyArrow treats as missing, matching pandas' default NA strings
+# so blank text cells become NaN on both parsing paths
+NULL_VALUES = [
+    "", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan",
+    "1.#IND", "1.#QNAN", "<NA>", "N/A", "NA", "NULL", "NaN", "None", "n/a",
+    "nan", "null"
+]
+
+
+def read_csv_arrow(file_bytes: bytes, usecols: list):
+    """
+    Parse CSV bytes with PyArrow's multithreaded reader.
+
+    The bytes are wrapped in a BufferReader rather than copied into another
+    buffer, and the Arrow table's memory is released while it is converted.
+    Returns None when Order Date was parsed with an implausible year, so the
+    caller can fall back to the pandas parser.
+    """
+    table = pacsv.read_csv(
+        pa.BufferReader(file_bytes),
+        read_options=pacsv.ReadOptions(encoding="ISO-8859-1"),
+        convert_options=pacsv.ConvertOptions(
+            include_columns=usecols,
+            timestamp_parsers=DATE_FORMATS,
+            null_values=NULL_VALUES,
+            strings_can_be_null=True
+        )
+    )
+    data = table.to_pandas(split_blocks=True, self_destruct=True)
+
+    # Reject implausible years from a mismatched date format
+    order_dates = data["Order Date"]
+    if (
+        pd.api.types.is_datetime64_any_dtype(order_dates)
+        and order_dates.dt.year.min() < MIN_ORDER_YEAR
+    ):
+        return None
+    return data
+
+
+@st.cache_resource(show_spinner=False, max_entries=DATA_CACHE_ENTRIES, ttl=CACHE_TTL_SECONDS)
+def load_data(file_key: str, _file_bytes: bytes, name: str) -> pd.DataFrame:
+    """
+    Parse and preprocess the uploaded file.
+
+    Cached as a shared resource keyed on the hash of the file contents, so
+    reruns and sessions uploading the same file reuse one DataFrame without
+    copying or pickling it. The returned frame must be treated as read-only.
+    """
+    buffer = io.BytesIO(_file_bytes)
+    if name.endswith('.csv') or name.endswith('.txt'):
+        # Read the header first so only the used columns are parsed
+        header = pd.read_csv(buffer, nrows=0, encoding="ISO-8859-1").columns
+        usecols = [column for column in header if column in USED_COLUMNS]
+        buffer.seek(0)
+
+        # Prefer the PyArrow reader, falling back to the C engine when pyarrow
+        # is unavailable, cannot handle the file or returns no result
+        data = None
+        if pa is not None:
+            try:
+                data = read_csv_arrow(_file_bytes, usecols)
+            except pa.ArrowException:
+                pass
+        if data is None:
+            data = pd.read_csv(
+                buffer,
+                engine="c",
+                encoding="ISO-8859-1",
+                usecols=usecols,
+                low_memory=False,
+                cache_dates=True,
+                parse_dates=["Order Date"]
+            )
+    else:
+        data = pd.read_excel(buffer, usecols=lambda column: column in USED_COLUMNS)
+
+    # Convert Order Date to datetime format if the parser did not already
+    if not pd.api.types.is_datetime64_any_dtype(data["Order Date"]):
+        data["Order Date"] = pd.to_datetime(data["Order Date"], cache=True, errors='coerce')
+
+    # Remove any rows with invalid dates
+    data = data.dropna(subset=["Order Date"])
+
+    # Store repeated text values as categories to cut memory and speed up
+    # filtering and grouping
+    for column in CATEGORY_COLUMNS:
+        if column in data.columns:
+            data[column] = data[column].astype("category")
+
+    # Downcast numeric columns to the smallest dtype that holds the values;
+    # money columns only drop to float32 when every value round-trips exactly
+    for column in ["Sales", "Profit"]:
+        if column in data.columns:
+            values = pd.to_numeric(data[column]).to_numpy(dtype=np.float64)
+            narrowed = values.astype(np.float32)
+            if np.array_equal(narrowed.astype(np.float64), values, equal_nan=True):
+                data[column] = narrowed
+            else:
+                data[column] = values
+    if "Quantity" in data.columns:
+        data["Quantity"] = pd.to_numeric(data["Quantity"], downcast="integer")
+
+    return data
+
+# ============================================================================
+# LOCATION HIERARCHY
+# ============================================================================
+@st.cache_data(show_spinner=False, max_entries=AGG_CACHE_ENTRIES, ttl=CACHE_TTL_SECONDS)
+def location_hierarchy(_df: pd.DataFrame, key: tuple) -> tuple:
+    """
+    Map each region to its states and each state to its cities.
+
+    Computed once per upload and date range so the dependent location
+    dropdowns are built from dict lookups instead of scanning the frame.
+    """
+    # Blank states/cities are dropped so every listed state is also a key of
+    # state_to_cities (groupby never produces a NaN key)
+    region_to_states = {
+        region: list(states)
+        for region, states in _df.dropna(subset=["State"])
+        .groupby("Region", observed=True, sort=False)["State"].unique().items()
+    }
+    state_to_cities = {
+        state: list(cities)
+        for state, cities in _df.dropna(subset=["City"])
+        .groupby("State", observed=True, sort=False)["City"].unique().items()
+    }
+    return region_to_states, state_to_cities
+
+
+def collect_options(mapping: dict, keys) -> list:
+    """Union of the mapped values for the given keys, in first-seen order."""
+    return list(dict.fromkeys(value for key in keys for value in mapping.get(key, ())))
+
+
+def category_totals(df: pd.DataFrame, columns: list) -> pd.DataFrame:
+    """
+    Sum the given numeric columns per category.
+
+    Uses np.bincount over the Category codes, which is a single vectorised
+    pass per column instead of a full groupby. Missing values are skipped,
+    as in groupby().sum(), and only categories present in the frame are
+    returned.
+    """
+    codes = df["Category"].cat.codes.to_numpy()
+    valid = codes >= 0
+    codes = codes[valid]
+    n_categories = len(df["Category"].cat.categories)
+
+    present = np.bincount(codes, minlength=n_categories) > 0
+    totals = {"Category": df["Category"].cat.categories[present]}
+    for column in columns:
+        weights = np.nan_to_num(df[column].to_numpy(dtype=np.float64)[valid], nan=0.0)
+        sums = np.bincount(codes, weights=weights, minlength=n_categories)
+        totals[column] = sums[present]
+    return pd.DataFrame(totals)
+
+# ============================================================================
+# CACHED AGGREGATIONS
+# ============================================================================
+# Each helper takes the filtered frame as ``_df`` (the leading underscore tells
+# Streamlit not to hash it) and a hashable ``key`` describing the upload and
+# filter selections, so theme changes reuse the cached results.
+
+@st.cache_data(show_spinner=False, max_entries=AGG_CACHE_ENTRIES, ttl=CACHE_TTL_SECONDS)
+def agg_category_sales(_df: pd.DataFrame, key: tuple) -> pd.DataFrame:
+    """Total sales per category."""
+    return category_totals(_df, ["Sales"])
+
+
+@st.cache_data(show_spinner=False, max_entries=AGG_CACHE_ENTRIES, ttl=CACHE_TTL_SECONDS)
+def agg_top_cities(_df: pd.DataFrame, key: tuple) -> pd.DataFrame:
+    """Top 10 cities by total sales."""
+    return (
+        _df.groupby(by=["City"], as_index=False, observed=True, sort=False)["Sales"]
+        .sum()
+        .nlargest(10, "Sales")
+    )
+
+
+@st.cache_data(show_spinner=False, max_entries=AGG_CACHE_ENTRIES, ttl=CACHE_TTL_SECONDS)
+def agg_monthly_sales(_df: pd.DataFrame, key: tuple) -> pd.DataFrame:
+    """Total sales per month-year bucket, in chronological order."""
+    # Truncate to months on the raw datetime64 values, then only format the
+    # unique bucket labels
+    months = _df["Order Date"].to_numpy().astype("datetime64[M]")
+    linechart = (
+        pd.DataFrame({"bucket": months, "Sales": _df["Sales"].to_numpy()})
+        .groupby("bucket", sort=True)["Sales"]
+        .sum()
+        .reset_index()
+    )
+    linechart["month_year"] = linechart["bucket"].dt.strftime("%Y : %b")
+    return linechart[["month_year", "Sales"]]
+
+
+@st.cache_data(show_spinner=False, max_entries=AGG_CACHE_ENTRIES, ttl=CACHE_TTL_SECONDS)
+def agg_treemap_sales(_df: pd.DataFrame, key: tuple) -> pd.DataFrame:
+    """Total sales per region, category and sub-category."""
+    return _df.groupby(
+        ["Region", "Category", "Sub-Category"], as_index=False, observed=True, sort=False
+    )["Sales"].sum()
+
+
+@st.cache_data(show_spinner=False, max_entries=AGG_CACHE_ENTRIES, ttl=CACHE_TTL_SECONDS)
+def agg_segment_sales(_df: pd.DataFrame, key: tuple) -> pd.DataFrame:
+    """Total sales per customer segment."""
+    return _df.groupby("Segment", observed=True, sort=False)["Sales"].sum().reset_index()
+
+
+@st.cache_data(show_spinner=False, max_entries=AGG_CACHE_ENTRIES, ttl=CACHE_TTL_SECONDS)
+def agg_region_performance(_df: pd.DataFrame, key: tuple) -> pd.DataFrame:
+    """Sales, profit and quantity totals per region."""
+    return _df.groupby("Region", observed=True, sort=False).agg({
+        "Sales": "sum",
+        "Profit": "sum",
+        "Quantity": "sum"
+    }).reset_index()
+
+
+@st.cache_data(show_spinner=False, max_entries=AGG_CACHE_ENTRIES, ttl=CACHE_TTL_SECONDS)
+def agg_subcategory_month(_df: pd.DataFrame, key: tuple) -> pd.DataFrame:
+    """Pivot of sales with sub-categories as rows and month names as columns."""
+    pivot = pd.pivot_table(
+        data=_df.assign(month=_df["Order Date"].dt.month_name()),
+        values="Sales",
+        index=["Sub-Category"],
+        columns="month",
+        aggfunc="sum",
+        observed=True
+    )
+    # Order month columns by calendar rather than alphabetically
+    return pivot.reindex(columns=[m for m in calendar.month_name[1:] if m in pivot.columns])
+
+
+@st.cache_data(show_spinner=False, max_entries=AGG_CACHE_ENTRIES, ttl=CACHE_TTL_SECONDS)
+def agg_top_products(_df: pd.DataFrame, key: tuple) -> pd.DataFrame:
+    """Top 10 products by total profit."""
+    return (
+        _df.groupby("Product Name", observed=True, sort=False)["Profit"]
+        .sum()
+        .nlargest(10)
+        .reset_index()
+    )
+
+
+@st.cache_data(show_spinner=False, max_entries=AGG_CACHE_ENTRIES, ttl=CACHE_TTL_SECONDS)
+def agg_category_profit(_df: pd.DataFrame, key: tuple) -> pd.DataFrame:
+    """Sales, profit and profit margin per category."""
+    category_profit = category_totals(_df, ["Sales", "Profit"])
+
+    category_profit["Profit Margin %"] = (
+        category_profit["Profit"] / category_profit["Sales"] * 100
+    )
+    return category_profit
+
+
+@st.cache_data(show_spinner=False, max_entries=AGG_CACHE_ENTRIES, ttl=CACHE_TTL_SECONDS)
+def to_csv_bytes(_df: pd.DataFrame, key: tuple, index: bool = False) -> bytes:
+    """UTF-8 encoded CSV export of a frame, cached per key."""
+    return _df.to_csv(index=index).encode('utf-8')
+
 # ============================================================================
 # FILE UPLOAD SECTION
 # ============================================================================
@@ -117,12 +425,11 @@ if f1 is not None:
     file_name = f1.name
     st.sidebar.success(f"✅ Loaded: {file_name}")
     
-    # Read the uploaded file based on its extension
+    # Read and preprocess the uploaded file (cached across reruns)
     try:
-        if file_name.endswith('.csv') or file_name.endswith('.txt'):
-            df = pd.read_csv(f1, encoding="ISO-8859-1")
-        else:
-            df = pd.read_excel(f1)
+        file_bytes = f1.getvalue()
+        file_key = hashlib.md5(file_bytes, usedforsecurity=False).hexdigest()
+        df = load_data(file_key, file_bytes, file_name)
     except Exception as e:
         st.error(f"Error reading file: {e}")
         st.stop()
@@ -134,12 +441,6 @@ else:
 # ============================================================================
 # DATA PREPROCESSING
 # ============================================================================
-# Convert Order Date to datetime format
-df["Order Date"] = pd.to_datetime(df["Order Date"], errors='coerce')
-
-# Remove any rows with invalid dates
-df = df.dropna(subset=["Order Date"])
-
 # Extract min and max dates for date range filter
 startDate = df["Order Date"].min()
 endDate = df["Order Date"].max()
@@ -150,15 +451,13 @@ endDate = df["Order Date"].max()
 st.sidebar.markdown("---")
 st.sidebar.subheader("📥 Download Dataset")
 
-# Convert full dataset to CSV
-full_dataset_csv = df.to_csv(index=False).encode('utf-8')
-
+# Serve the original upload so every column is kept, not just the parsed ones
 st.sidebar.download_button(
     label="⬇️ Download Full Dataset",
-    data=full_dataset_csv,
-    file_name='superstore_full_dataset.csv',
-    mime='text/csv',
-    help='Download the complete dataset as CSV file for external use'
+    data=file_bytes,
+    file_name='superstore_full_dataset' + os.path.splitext(file_name)[1],
+    mime=f1.type or 'application/octet-stream',
+    help='Download the complete uploaded dataset for external use'
 )
 
 # ============================================================================
@@ -184,75 +483,66 @@ df = df[(df["Order Date"] >= date1) & (df["Order Date"] <= date2)].copy()
 st.sidebar.markdown("---")
 st.sidebar.subheader("🌍 Location Filters")
 
+# Boolean mask accumulating the active location filters
+mask = np.ones(len(df), dtype=bool)
+
+# Region -> state -> city lookups for the dependent dropdowns
+region_to_states, state_to_cities = location_hierarchy(df, (file_key, date1, date2))
+
 # Region filter
 region = st.sidebar.multiselect(
     "Pick Region(s):",
-    options=df["Region"].unique(),
+    options=list(region_to_states),
     help="Filter by one or more regions"
 )
 
-# Create filtered dataframe based on region selection
-if not region:
-    df2 = df.copy()
-else:
-    df2 = df[df["Region"].isin(region)]
+if region:
+    mask &= df["Region"].isin(region).to_numpy()
 
 # State filter (based on selected regions)
+state_options = collect_options(region_to_states, region) if region else list(state_to_cities)
 state = st.sidebar.multiselect(
     "Pick State(s):",
-    options=df2["State"].unique(),
+    options=state_options,
     help="Filter by one or more states"
 )
 
-if not state:
-    df3 = df2.copy()
-else:
-    df3 = df2[df2["State"].isin(state)]
+if state:
+    mask &= df["State"].isin(state).to_numpy()
 
 # City filter (based on selected states)
 city = st.sidebar.multiselect(
     "Pick City(ies):",
-    options=df3["City"].unique(),
+    options=collect_options(state_to_cities, state or state_options),
     help="Filter by one or more cities"
 )
 
-if not city:
-    df4 = df3.copy()
-else:
-    df4 = df3[df3["City"].isin(city)]
+if city:
+    mask &= df["City"].isin(city).to_numpy()
 
 # ============================================================================
 # APPLY ALL FILTERS TO CREATE FINAL FILTERED DATAFRAME
 # ============================================================================
-# Complex filtering logic to handle all combinations of filters
-if not region and not state and not city:
-    filtered_df = df
-elif not state and not city:
-    filtered_df = df[df["Region"].isin(region)]
-elif not region and not city:
-    filtered_df = df[df["State"].isin(state)]
-elif state and city:
-    filtered_df = df3[df["State"].isin(state) & df3["City"].isin(city)]
-elif region and city:
-    filtered_df = df3[df["Region"].isin(region) & df3["City"].isin(city)]
-elif region and state:
-    filtered_df = df3[df["Region"].isin(region) & df3["State"].isin(state)]
-elif city:
-    filtered_df = df3[df3["City"].isin(city)]
-else:
-    filtered_df = df3[df3["Region"].isin(region) & df3["State"].isin(state) & df3["City"].isin(city)]
+filtered_df = df.loc[mask]
+
+# Hashable description of the current data and filters for cached aggregations
+filter_key = (file_key, date1, date2, tuple(region), tuple(state), tuple(city))
 
 # ============================================================================
 # KEY PERFORMANCE INDICATORS (KPIs)
 # ============================================================================
 st.markdown("### 📈 Key Performance Indicators")
 
-# Calculate KPI metrics
-total_sales = filtered_df["Sales"].sum()
-total_profit = filtered_df["Profit"].sum()
-total_quantity = filtered_df["Quantity"].sum()
+# Calculate KPI metrics (numeric totals in a single pass)
+totals = filtered_df[["Sales", "Profit", "Quantity"]].sum()
+total_sales = totals["Sales"]
+total_profit = totals["Profit"]
+total_quantity = totals["Quantity"]
 profit_margin = (total_profit / total_sales * 100) if total_sales > 0 else 0
-avg_order_value = filtered_df.groupby("Order ID")["Sales"].sum().mean() if "Order ID" in filtered_df.columns else total_sales / len(filtered_df)
+avg_order_value = filtered_df.groupby("Order ID", observed=True, sort=False)["Sales"].sum().mean() if "Order ID" in filtered_df.columns else total_sales / len(filtered_df)
+
+# Calculate number of unique customers if Customer ID exists
+unique_customers = filtered_df["Customer ID"].nunique() if "Customer ID" in filtered_df.columns else len(filtered_df)
 
 # Display KPIs in columns
 kpi1, kpi2, kpi3, kpi4, kpi5 = st.columns(5)
@@ -286,8 +576,6 @@ with kpi4:
     )
 
 with kpi5:
-    # Calculate number of unique customers if Customer ID exists
-    unique_customers = filtered_df["Customer ID"].nunique() if "Customer ID" in filtered_df.columns else len(filtered_df)
     st.metric(
         label="👥 Customers",
         value=f"{unique_customers:,}",
@@ -302,7 +590,7 @@ st.markdown("---")
 col1, col2 = st.columns(2)
 
 # Category-wise sales aggregation
-category_df = filtered_df.groupby(by=["Category"], as_index=False)["Sales"].sum()
+category_df = agg_category_sales(filtered_df, filter_key)
 
 with col1:
     st.subheader("🏷️ Category-wise Sales Performance")
@@ -312,7 +600,7 @@ with col1:
         category_df,
         x="Category",
         y="Sales",
-        text=['${:,.0f}'.format(x) for x in category_df["Sales"]],
+        text_auto='$,.0f',
         template=theme,
         color="Sales",
         color_continuous_scale="Blues"
@@ -332,19 +620,14 @@ with col2:
     st.subheader("🏙️ Top 10 Cities by Sales")
     
     # Aggregate top 10 cities by sales
-    top_cities = (
-        filtered_df.groupby(by=["City"], as_index=False)["Sales"]
-        .sum()
-        .sort_values(by="Sales", ascending=False)
-        .head(10)
-    )
+    top_cities = agg_top_cities(filtered_df, filter_key)
     
     # Create horizontal bar chart for better readability
     fig = px.bar(
         top_cities,
         x="Sales",
         y="City",
-        text=['${:,.0f}'.format(x) for x in top_cities["Sales"]],
+        text_auto='$,.0f',
         template=theme,
         color="Sales",
         color_continuous_scale="Viridis",
@@ -369,11 +652,13 @@ cl1, cl2 = st.columns(2)
 
 with cl1:
     with st.expander("📋 Category Sales Data Table"):
-        st.write(
-            category_df.style.background_gradient(cmap='YlGnBu')
-            .format({'Sales': '${:,.2f}'})
+        st.dataframe(
+            category_df,
+            use_container_width=True,
+            hide_index=True,
+            column_config={"Sales": st.column_config.NumberColumn(format="$%.2f")}
         )
-        csv = category_df.to_csv(index=False).encode('utf-8')
+        csv = to_csv_bytes(category_df, ("category", filter_key))
         st.download_button(
             "⬇️ Download Category Data",
             data=csv,
@@ -384,11 +669,13 @@ with cl1:
 
 with cl2:
     with st.expander("📋 Top 10 Cities Data Table"):
-        st.write(
-            top_cities.style.background_gradient(cmap='YlGnBu')
-            .format({'Sales': '${:,.2f}'})
+        st.dataframe(
+            top_cities,
+            use_container_width=True,
+            hide_index=True,
+            column_config={"Sales": st.column_config.NumberColumn(format="$%.2f")}
         )
-        csv = top_cities.to_csv(index=False).encode('utf-8')
+        csv = to_csv_bytes(top_cities, ("top_cities", filter_key))
         st.download_button(
             "⬇️ Download Top Cities Data",
             data=csv,
@@ -404,18 +691,13 @@ st.markdown("---")
 # ============================================================================
 st.subheader("📅 Sales Trends Over Time")
 
-# Create month-year column for time series analysis
-filtered_df["month_year"] = filtered_df["Order Date"].dt.to_period("M")
-
 # Aggregate sales by month
-linechart = pd.DataFrame(
-    filtered_df.groupby(filtered_df["month_year"].dt.strftime("%Y : %b"))["Sales"].sum()
-).reset_index()
+linechart = agg_monthly_sales(filtered_df, filter_key)
 
-# Create area chart for time series
+# Create area chart for time series (WebGL-rendered)
 fig2 = go.Figure()
 
-fig2.add_trace(go.Scatter(
+fig2.add_trace(go.Scattergl(
     x=linechart["month_year"],
     y=linechart["Sales"],
     mode='lines+markers',
@@ -438,8 +720,13 @@ st.plotly_chart(fig2, use_container_width=True)
 
 # Time series data table with download option
 with st.expander("📊 View Time Series Data"):
-    st.write(linechart.T.style.background_gradient(cmap="Blues"))
-    csv = linechart.to_csv(index=False).encode("utf-8")
+    st.dataframe(
+        linechart,
+        use_container_width=True,
+        hide_index=True,
+        column_config={"Sales": st.column_config.NumberColumn(format="$%.2f")}
+    )
+    csv = to_csv_bytes(linechart, ("time_series", filter_key))
     st.download_button(
         '⬇️ Download Time Series Data',
         data=csv,
@@ -454,8 +741,11 @@ st.markdown("---")
 # ============================================================================
 st.subheader("🗺️ Hierarchical Sales View - Region → Category → Sub-Category")
 
+# Pre-aggregate so only one row per leaf is sent to the browser
+tree_df = agg_treemap_sales(filtered_df, filter_key)
+
 fig3 = px.treemap(
-    filtered_df,
+    tree_df,
     path=["Region", "Category", "Sub-Category"],
     values="Sales",
     hover_data=["Sales"],
@@ -479,7 +769,7 @@ chart1, chart2 = st.columns(2)
 with chart1:
     st.subheader("🎯 Sales Distribution by Segment")
     
-    segment_df = filtered_df.groupby("Segment")["Sales"].sum().reset_index()
+    segment_df = agg_segment_sales(filtered_df, filter_key)
     
     fig = px.pie(
         segment_df,
@@ -501,7 +791,7 @@ with chart1:
 with chart2:
     st.subheader("📦 Sales Distribution by Category")
     
-    category_pie_df = filtered_df.groupby("Category")["Sales"].sum().reset_index()
+    category_pie_df = category_df
     
     fig = px.pie(
         category_pie_df,
@@ -528,11 +818,7 @@ st.markdown("---")
 st.subheader("🌎 Regional Performance Comparison")
 
 # Aggregate data by region
-region_performance = filtered_df.groupby("Region").agg({
-    "Sales": "sum",
-    "Profit": "sum",
-    "Quantity": "sum"
-}).reset_index()
+region_performance = agg_region_performance(filtered_df, filter_key)
 
 # Create grouped bar chart
 fig_region = go.Figure()
@@ -570,24 +856,32 @@ st.subheader("📊 Month-wise Sub-Category Sales Analysis")
 
 with st.expander("📋 Sample Data Preview"):
     df_sample = df.head(5)[["Region", "State", "City", "Category", "Sales", "Profit", "Quantity"]]
-    fig_table = ff.create_table(df_sample, colorscale="Cividis")
-    st.plotly_chart(fig_table, use_container_width=True)
+    st.dataframe(df_sample, use_container_width=True)
 
 # Create pivot table for month-wise sub-category sales
 st.markdown("#### 📅 Monthly Sub-Category Sales Matrix")
-filtered_df["month"] = filtered_df["Order Date"].dt.month_name()
+sub_category_year = agg_subcategory_month(filtered_df, filter_key)
+
+# Heatmap renders the matrix client-side instead of as a server-built table
+fig_pivot = px.imshow(
+    sub_category_year,
+    x=sub_category_year.columns,
+    y=sub_category_year.index,
+    color_continuous_scale="Blues",
+    text_auto='$,.0f',
+    aspect="auto",
+    labels=dict(x="Month", y="Sub-Category", color="Sales ($)")
+)
 
-sub_category_year = pd.pivot_table(
-    data=filtered_df,
-    values="Sales",
-    index=["Sub-Category"],
-    columns="month"
+fig_pivot.update_layout(
+    template=theme,
+    height=max(400, 30 * len(sub_category_year))
 )
 
-st.write(sub_category_year.style.background_gradient(cmap="Blues").format("${:,.0f}"))
+st.plotly_chart(fig_pivot, use_container_width=True)
 
 # Download option for pivot table
-csv_pivot = sub_category_year.to_csv().encode('utf-8')
+csv_pivot = to_csv_bytes(sub_category_year, ("subcategory_month", filter_key), index=True)
 st.download_button(
     "⬇️ Download Monthly Sub-Category Data",
     data=csv_pivot,
@@ -608,13 +902,7 @@ with profit_col1:
     st.markdown("#### 🏆 Top 10 Profitable Products")
     
     if "Product Name" in filtered_df.columns:
-        top_products = (
-            filtered_df.groupby("Product Name")["Profit"]
-            .sum()
-            .sort_values(ascending=False)
-            .head(10)
-            .reset_index()
-        )
+        top_products = agg_top_products(filtered_df, filter_key)
         
         fig_profit = px.bar(
             top_products,
@@ -637,14 +925,7 @@ with profit_col2:
     # Profit margin by category
     st.markdown("#### 📊 Profit Margin by Category")
     
-    category_profit = filtered_df.groupby("Category").agg({
-        "Sales": "sum",
-        "Profit": "sum"
-    }).reset_index()
-    
-    category_profit["Profit Margin %"] = (
-        category_profit["Profit"] / category_profit["Sales"] * 100
-    )
+    category_profit = agg_category_profit(filtered_df, filter_key)
     
     fig_margin = px.bar(
         category_profit,
@@ -652,11 +933,10 @@ with profit_col2:
         y="Profit Margin %",
         template=theme,
         color="Profit Margin %",
-        color_continuous_scale="RdYlGn",
-        text=category_profit["Profit Margin %"].apply(lambda x: f'{x:.1f}%')
+        color_continuous_scale="RdYlGn"
     )
     
-    fig_margin.update_traces(textposition='outside')
+    fig_margin.update_traces(texttemplate='%{y:.1f}%', textposition='outside')
     fig_margin.update_layout(height=400)
     
     st.plotly_chart(fig_margin, use_container_width=True)
@@ -664,13 +944,12 @@ with profit_col2:
 # ============================================================================
 # FOOTER
 # ============================================================================
-st.markdown("---")
-st.markdown(
-    """
+FOOTER_HTML = """
     <div style='text-align: center; color: white;'>
         <p>Amartay Kumar Dhar</p>
         <p>Email: antukumardhar100@gmail.com</p>
     </div>
-    """,
-    unsafe_allow_html=True
-)
\ No newline at end of file
+    """
+
+st.markdown("---")
+st.markdown(FOOTER_HTML, unsafe_allow_html=True)
\ No newline at end of file